@@ -88,30 +88,31 @@ def create_dataform_workflow_invocation_sensor(
         context.log.info(
             f"Getting latest workflow invocations from dataform repository for the last {minutes_ago} minutes"
         )
-        workflow_invocations = resource.get_latest_workflow_invocations(
-            minutes_ago=minutes_ago
+        # Drain the pager once; every invocation in the window is processed
+        workflow_invocations = list(
+            resource.get_latest_workflow_invocations(minutes_ago=minutes_ago)  # pyright: ignore[reportArgumentType]
         )
 
-        # context.log.info(f"Found {len(workflow_invocations)} workflow invocations")
+        context.log.info(f"Found {len(workflow_invocations)} workflow invocations")
 
         dataform_workflow_invocation_cursors = {}
 
         asset_events = []
         run_requests = []
-        for index, workflow_invocation in enumerate(workflow_invocations):  # pyright: ignore[reportArgumentType]
+        for index, workflow_invocation in enumerate(workflow_invocations):
             workflow_invocation_details = resource.query_workflow_invocation(
                 workflow_invocation.name
             )
 
             context.log.info(
-                f"Processing workflow invocation {index + 1} of {len(list(workflow_invocations))}: {workflow_invocation.name}"  # pyright: ignore[reportArgumentType]
+                f"Processing workflow invocation {index + 1} of {len(workflow_invocations)}: {workflow_invocation.name}"
             )
 
             for index, action in enumerate(
                 workflow_invocation_details.workflow_invocation_actions
             ):
                 context.log.info(
-                    f"  Target Asset for action {index + 1} of {len(list(workflow_invocation_details.workflow_invocation_actions))}: {action.target.name}, State: {action.state.name}"
+                    f"  Target Asset for action {index + 1} of {len(workflow_invocation_details.workflow_invocation_actions)}: {action.target.name}, State: {action.state.name}"
                 )
 
                 asset_name = action.target.name
@@ -1,4 +1,10 @@
+import asyncio
+import itertools
+import threading
+import weakref
 import dagster as dg
+from collections import defaultdict
+from functools import cache, cached_property
 from typing import Any
 
 from dagster_dataform.utils import get_epoch_time_ago, empty_fn
@@ -6,6 +12,111 @@ from dagster_dataform.utils import get_epoch_time_ago, empty_fn
 from google.cloud import dataform_v1
 
 
+# Partial response field masks, sent through the x-goog-fieldmask system parameter since the Dataform v1
+# list and query requests have no read_mask field. They only keep the fields this resource reads.
+_COMPILATION_RESULTS_FIELD_MASK = (
+    "compilationResults.name,"
+    "compilationResults.gitCommitish,"
+    "compilationResults.codeCompilationConfig.tablePrefix,"
+    "nextPageToken"
+)
+_COMPILATION_RESULT_ACTIONS_FIELD_MASK = (
+    "compilationResultActions.target,"
+    "compilationResultActions.relation.tags,"
+    "compilationResultActions.relation.dependencyTargets,"
+    "compilationResultActions.relation.selectQuery,"
+    "compilationResultActions.assertion.parentAction,"
+    # Every assertion has a query; without it a standalone assertion comes back as an empty, falsy message
+    "compilationResultActions.assertion.selectQuery,"
+    "nextPageToken"
+)
+
+
+# Only the most recent compilation results for the environment are scanned, so finding the latest one
+# costs at most a single page
+_COMPILATION_RESULTS_PAGE_SIZE = 10
+
+# SQL longer than this is attached as plain text instead of being copied into a markdown code block
+_MAX_MARKDOWN_SQL_LENGTH = 8192
+
+
+@cache
+def _freshness_policy(maximum_lag_minutes: float) -> dg.LegacyFreshnessPolicy:
+    """Freshness policies are immutable, so every asset with the same lag can share one instance."""
+    return dg.LegacyFreshnessPolicy(maximum_lag_minutes=maximum_lag_minutes)
+
+
+_default_client: dataform_v1.DataformClient | None = None
+_default_client_lock = threading.Lock()
+
+
+def _get_default_client() -> dataform_v1.DataformClient:
+    """Return the process-wide DataformClient, creating it on first use.
+    Resources can be rebuilt per run, so sharing one client avoids setting up a new channel each time.
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                # Pin gRPC so the shared client multiplexes calls over one HTTP/2 channel. gRPC already
+                # advertises gzip in grpc-accept-encoding, so responses can be compressed without extra metadata.
+                _default_client = dataform_v1.DataformClient(transport="grpc")
+    return _default_client
+
+
+# grpc.aio channels are bound to the event loop they are created on, so async clients are shared per loop.
+# A client is dropped with its loop, and its channel is closed when the client is garbage collected.
+_default_async_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dataform_v1.DataformAsyncClient
+] = weakref.WeakKeyDictionary()
+
+
+def _get_default_async_client() -> dataform_v1.DataformAsyncClient:
+    """Return the DataformAsyncClient shared by the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    client = _default_async_clients.get(loop)
+    if client is None:
+        client = _default_async_clients[loop] = dataform_v1.DataformAsyncClient()
+    return client
+
+
+# The raw protobuf class behind dataform_v1.Target; building it directly and wrapping it
+# skips the per-field marshalling done by the proto-plus constructor
+_TARGET_PB = dataform_v1.Target.pb()
+
+
+def _to_target(target: str | dict) -> dataform_v1.Target:
+    """Convert a target name or a dict with database, schema and name keys to a Target."""
+    if isinstance(target, dict):
+        # Only pass non-None values to avoid protobuf serialization issues
+        return dataform_v1.Target.wrap(
+            _TARGET_PB(
+                **{
+                    key: target[key]
+                    for key in ("database", "schema", "name")
+                    if target.get(key)
+                }
+            )
+        )
+    return dataform_v1.Target.wrap(_TARGET_PB(name=target))
+
+
+def _quote_filter_value(value: str) -> str:
+    """Quote a value for a Dataform list filter, escaping backslashes and double quotes."""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _matches_environment(
+    compilation_result: dataform_v1.CompilationResult, environment: str
+) -> bool:
+    """Whether a compilation result was compiled from the environment branch without a table prefix."""
+    return (
+        compilation_result.git_commitish == environment
+        and not compilation_result.code_compilation_config.table_prefix
+    )
+
+
 class DataformRepositoryResource:
     """This resource exposes methods for interacting with the Dataform resource via the GCP Python SDK."""
 
@@ -23,15 +134,63 @@ class DataformRepositoryResource:
         self.location = location
         self.repository_id = repository_id
         self.environment = environment
-        self.client = client if client is not None else dataform_v1.DataformClient()
+        self.client = client if client is not None else _get_default_client()
         self.logger = dg.get_dagster_logger()
         self.sensor_minimum_interval_seconds = sensor_minimum_interval_seconds
         self.asset_fresh_policy_lag_minutes = asset_fresh_policy_lag_minutes
 
-        self.assets = self.load_dataform_assets(
-            fresh_policy_lag_minutes=self.asset_fresh_policy_lag_minutes
+        # Nothing is compiled here. The first access to assets or asset_checks compiles and queries once,
+        # then derives both from the same list of compilation actions, cached until invalidate() is called.
+
+    @cached_property
+    def _latest_actions(self) -> tuple[str | None, list[Any]]:
+        """The name of the latest compilation result for the environment and its compilation actions."""
+        return self._compile_and_query()
+
+    @cached_property
+    def _dataform_definitions(
+        self,
+    ) -> tuple[
+        list[dg.AssetSpec], list[dg.AssetChecksDefinition], dict[str, list[str]]
+    ]:
+        _, compilation_actions = self._latest_actions
+        return self._process_actions(
+            compilation_actions,
+            fresh_policy_lag_minutes=self.asset_fresh_policy_lag_minutes,
         )
-        self.asset_checks = self.load_dataform_asset_check_specs()
+
+    @property
+    def assets(self) -> list[dg.AssetSpec]:
+        return self._dataform_definitions[0]
+
+    @property
+    def asset_checks(self) -> list[dg.AssetChecksDefinition]:
+        return self._dataform_definitions[1]
+
+    @property
+    def forward_deps(self) -> dict[str, list[str]]:
+        """Mapping of each asset name to the names of the assets it depends on."""
+        return self._dataform_definitions[2]
+
+    @cached_property
+    def reverse_deps(self) -> dict[str, list[str]]:
+        """Mapping of each asset name to the names of the assets that depend on it."""
+        reverse_deps = defaultdict(list)
+        for name, deps in self.forward_deps.items():
+            for dep in deps:
+                reverse_deps[dep].append(name)
+        return dict(reverse_deps)
+
+    def invalidate(self) -> None:
+        """Drop the cached compilation actions so the next access to assets or asset_checks recompiles."""
+        self.__dict__.pop("_latest_actions", None)
+        self.__dict__.pop("_dataform_definitions", None)
+        self.__dict__.pop("reverse_deps", None)
+
+    def refresh(self) -> None:
+        """Recompile now and replace the cached compilation actions, assets and asset checks."""
+        self.invalidate()
+        _ = self._dataform_definitions
 
     def create_compilation_result(
         self,
@@ -81,38 +240,51 @@ class DataformRepositoryResource:
             f"Fetching compilation results for repository: {self.repository_id}"
         )
 
-        request = dataform_v1.ListCompilationResultsRequest(
-            parent=f"projects/{self.project_id}/locations/{self.location}/repositories/{self.repository_id}",
-            page_size=1000,
-            order_by="create_time desc",
+        # The pager fetches further pages lazily; islice keeps the scan to the first page
+        pager = self.client.list_compilation_results(
+            request=self._list_compilation_results_request(),
+            metadata=[("x-goog-fieldmask", _COMPILATION_RESULTS_FIELD_MASK)],
         )
 
-        response = self.client.list_compilation_results(request=request)
-
-        self.logger.info(
-            f"Found {len(response.compilation_results)} compilation results"
-        )
-
-        for compilation_result in response.compilation_results:
-            if (
-                compilation_result.git_commitish == self.environment
-                and not compilation_result.code_compilation_config.table_prefix
-            ):
+        for compilation_result in itertools.islice(
+            pager, _COMPILATION_RESULTS_PAGE_SIZE
+        ):
+            if _matches_environment(compilation_result, self.environment):
                 return compilation_result.name
 
         self.logger.error(
-            f"No compilation result for {self.environment} branch in the last 10 compilation results"
+            f"No compilation result for {self.environment} branch in the last {_COMPILATION_RESULTS_PAGE_SIZE} compilation results"
         )
         return None
 
-    def query_compilation_result(self) -> list[Any]:
-        """Query a compilation result by ID. Returns the compilation result actions."""
+    def _list_compilation_results_request(
+        self,
+    ) -> dataform_v1.ListCompilationResultsRequest:
+        # Filter on the environment server side so only a handful of candidates are returned
+        return dataform_v1.ListCompilationResultsRequest(
+            parent=f"projects/{self.project_id}/locations/{self.location}/repositories/{self.repository_id}",
+            page_size=_COMPILATION_RESULTS_PAGE_SIZE,
+            order_by="create_time desc",
+            filter=f"git_commitish={_quote_filter_value(self.environment)}",
+        )
+
+    def query_compilation_result(
+        self, compilation_result_name: str | None = None
+    ) -> list[Any]:
+        """Query a compilation result by name, defaulting to the latest compilation result. Returns the compilation result actions."""
 
-        compilation_result_name = self.get_latest_compilation_result_name()
+        if compilation_result_name is None:
+            compilation_result_name = self.get_latest_compilation_result_name()
         if not compilation_result_name:
             self.logger.error("No compilation result name available")
             return []
 
+        return self._query_compilation_result_actions(compilation_result_name)
+
+    def _query_compilation_result_actions(
+        self, compilation_result_name: str, field_mask: str | None = None
+    ) -> list[Any]:
+        """Query the actions of a compilation result, optionally trimmed to the fields in field_mask."""
         self.logger.info(f"Querying compilation result: {compilation_result_name}")
 
         # Initialize request argument(s)
@@ -121,7 +293,10 @@ class DataformRepositoryResource:
         )
 
         # Make the request
-        response = self.client.query_compilation_result_actions(request=request)
+        response = self.client.query_compilation_result_actions(
+            request=request,
+            metadata=[("x-goog-fieldmask", field_mask)] if field_mask else [],
+        )
 
         self.logger.info(
             f"Found {len(response.compilation_result_actions)} compilation result actions"
@@ -138,17 +313,68 @@ class DataformRepositoryResource:
         self, minutes_ago: int
     ) -> dataform_v1.ListWorkflowInvocationsResponse:
         """Get the latest workflow invocation."""
-        request = dataform_v1.ListWorkflowInvocationsRequest(
+        request = self._list_workflow_invocations_request(minutes_ago)
+
+        self.logger.info(
+            f"Listing workflow invocations started in the last {minutes_ago} minutes"
+        )
+
+        response = self.client.list_workflow_invocations(request=request)
+
+        return response  # pyright: ignore[reportReturnType]
+
+    def _list_workflow_invocations_request(
+        self, minutes_ago: int
+    ) -> dataform_v1.ListWorkflowInvocationsRequest:
+        return dataform_v1.ListWorkflowInvocationsRequest(
             parent=f"projects/{self.project_id}/locations/{self.location}/repositories/{self.repository_id}",
             page_size=1000,
             filter=f"invocation_timing.start_time.seconds > {get_epoch_time_ago(minutes=minutes_ago)}",
         )
 
-        response = self.client.list_workflow_invocations(request=request)
+    async def refresh_async(
+        self,
+        minutes_ago: int,
+        async_client: dataform_v1.DataformAsyncClient | None = None,
+    ) -> tuple[str | None, list[dataform_v1.WorkflowInvocation]]:
+        """Fetch the latest compilation result name and the recent workflow invocations concurrently.
+        Uses the event loop's shared DataformAsyncClient unless async_client is given.
 
-        self.logger.info(f"Found response: {response}")
+        Usage from synchronous code: asyncio.run(resource.refresh_async(minutes_ago=20))
+        """
+        client = (
+            async_client if async_client is not None else _get_default_async_client()
+        )
 
-        return response  # pyright: ignore[reportReturnType]
+        async def fetch_compilation_result_name() -> str | None:
+            pager = await client.list_compilation_results(
+                request=self._list_compilation_results_request(),
+                metadata=[("x-goog-fieldmask", _COMPILATION_RESULTS_FIELD_MASK)],
+            )
+            scanned = 0
+            async for compilation_result in pager:
+                if _matches_environment(compilation_result, self.environment):
+                    return compilation_result.name
+                scanned += 1
+                if scanned >= _COMPILATION_RESULTS_PAGE_SIZE:
+                    break
+            return None
+
+        async def fetch_workflow_invocations() -> list[dataform_v1.WorkflowInvocation]:
+            pager = await client.list_workflow_invocations(
+                request=self._list_workflow_invocations_request(minutes_ago)
+            )
+            return [workflow_invocation async for workflow_invocation in pager]
+
+        compilation_result_name, workflow_invocations = await asyncio.gather(
+            fetch_compilation_result_name(), fetch_workflow_invocations()
+        )
+
+        self.logger.info(
+            f"Refreshed latest compilation result {compilation_result_name} and {len(workflow_invocations)} workflow invocations"
+        )
+
+        return compilation_result_name, workflow_invocations
 
     def query_workflow_invocation(
         self, name: str
@@ -211,21 +437,9 @@ class DataformRepositoryResource:
                 fully_refresh_incremental_tables_enabled=fully_refresh_incremental_tables_enabled,
             )
             if included_targets:
-                targets = []
-                for target in included_targets:
-                    if isinstance(target, dict):
-                        # Only pass non-None values to avoid protobuf serialization issues
-                        target_kwargs = {}
-                        if target.get("database"):
-                            target_kwargs["database"] = target["database"]
-                        if target.get("schema"):
-                            target_kwargs["schema"] = target["schema"]
-                        if target.get("name"):
-                            target_kwargs["name"] = target["name"]
-                        targets.append(dataform_v1.Target(**target_kwargs))
-                    else:
-                        targets.append(dataform_v1.Target(name=target))
-                invocation_config.included_targets = targets
+                invocation_config.included_targets = [
+                    _to_target(target) for target in included_targets
+                ]
             if included_tags:
                 invocation_config.included_tags = included_tags
             if service_account:
@@ -256,97 +470,180 @@ class DataformRepositoryResource:
 
         return response
 
+    def _compile_and_query(self) -> tuple[str | None, list[Any]]:
+        """Create a compilation result for the environment and return its name and actions."""
+        compilation_result = self.create_compilation_result(
+            git_commitish=self.environment
+        )
+        # The created result is the latest one for the environment, so only list compilation results if it has no name
+        compilation_result_name = (
+            compilation_result.name or self.get_latest_compilation_result_name()
+        )
+        if not compilation_result_name:
+            return None, []
+        # Asset and check building only read the fields in the mask, so the rest of each action is not sent
+        return compilation_result_name, self._query_compilation_result_actions(
+            compilation_result_name, field_mask=_COMPILATION_RESULT_ACTIONS_FIELD_MASK
+        )
+
     def load_dataform_assets(
         self,
         fresh_policy_lag_minutes: float = 1440,
     ) -> list[dg.AssetSpec]:
-        logger = dg.get_dagster_logger()
-        logger.info("Starting to load Dataform assets")
-
-        assets = []
-        self.create_compilation_result(git_commitish=self.environment)
-        compilation_actions = self.query_compilation_result()
+        """Return the asset specs for the cached compilation actions. Call invalidate() first to recompile."""
+        if fresh_policy_lag_minutes == self.asset_fresh_policy_lag_minutes:
+            return self.assets
+
+        # Only the freshness policy differs, so the asset checks are not rebuilt
+        _, compilation_actions = self._latest_actions
+        asset_actions, _ = self._partition_actions(compilation_actions)
+        assets, _ = self._build_asset_specs(
+            asset_actions, fresh_policy_lag_minutes=fresh_policy_lag_minutes
+        )
+        return assets
 
+    def _process_actions(
+        self,
+        compilation_actions: list[Any],
+        fresh_policy_lag_minutes: float = 1440,
+    ) -> tuple[
+        list[dg.AssetSpec], list[dg.AssetChecksDefinition], dict[str, list[str]]
+    ]:
+        """Build the asset specs and asset checks for a list of compilation actions.
+        Assertion actions become asset checks, every other action becomes an asset spec.
+        Also returns the dependency names of each asset, keyed by asset name.
+        """
+        logger = self.logger
+        logger.info("Starting to load Dataform assets and asset check specs")
         logger.info(f"Processing {len(compilation_actions)} compilation actions")
 
-        for asset in compilation_actions:
+        asset_actions, assertion_actions = self._partition_actions(compilation_actions)
+
+        assets, forward_deps = self._build_asset_specs(
+            asset_actions, fresh_policy_lag_minutes=fresh_policy_lag_minutes
+        )
+        asset_checks = self._build_asset_checks(assertion_actions)
+
+        logger.info(f"Successfully created {len(assets)} assets")
+        logger.info(f"Successfully created {len(asset_checks)} asset check specs")
+        return assets, asset_checks, forward_deps
+
+    def _partition_actions(
+        self, compilation_actions: list[Any]
+    ) -> tuple[list[Any], list[Any]]:
+        """Split compilation actions into asset actions and assertion actions, skipping actions without a target name."""
+        # Partition in one pass so each builder only walks its own, shorter list
+        # and the assertion field is read once per action.
+        assertion_actions = []
+        asset_actions = []
+        for action in compilation_actions:
+            if not action.target.name:
+                self.logger.warning("Skipping compilation action without a target name")
+                continue
+            (assertion_actions if action.assertion else asset_actions).append(action)
+        return asset_actions, assertion_actions
+
+    def _build_asset_specs(
+        self,
+        asset_actions: list[Any],
+        fresh_policy_lag_minutes: float = 1440,
+    ) -> tuple[list[dg.AssetSpec], dict[str, list[str]]]:
+        """Build an asset spec for each non-assertion compilation action."""
+        logger = self.logger
+
+        assets = []
+        forward_deps = {}
+
+        # Bind loop invariants to locals so large DAGs don't pay for the global and attribute lookups per action
+        asset_spec = dg.AssetSpec
+        url_metadata = dg.MetadataValue.url
+        md_metadata = dg.MetadataValue.md
+        text_metadata = dg.MetadataValue.text
+        freshness_policy = _freshness_policy(fresh_policy_lag_minutes)
+
+        for asset in asset_actions:
+            target = asset.target
+            relation = asset.relation
+            name = target.name
+            deps = [dep.name for dep in relation.dependency_targets]
+            select_query = relation.select_query
+            sql_metadata = (
+                md_metadata(f"```sql\n{select_query}\n```")
+                if len(select_query) <= _MAX_MARKDOWN_SQL_LENGTH
+                else text_metadata(select_query)
+            )
+
+            # Only the spec itself can fail, e.g. on a name Dagster rejects as an asset key or group name
             try:
-                spec = dg.AssetSpec(
-                    key=asset.target.name,
+                spec = asset_spec(
+                    key=name,
                     kinds={"bigquery"},
                     metadata={
-                        "Project ID": asset.target.database,
-                        "Dataset": asset.target.schema,
-                        "Asset Name": asset.target.name,
-                        "Docs Link": dg.MetadataValue.url(
-                            f"https://cvsdigital.atlassian.net/wiki/spaces/EDMLABCCM/pages/4616946342/Case+Activities+Entity+Data+Stream#{asset.target.name}"
+                        "Project ID": target.database,
+                        "Dataset": target.schema,
+                        "Asset Name": name,
+                        "Docs Link": url_metadata(
+                            f"https://cvsdigital.atlassian.net/wiki/spaces/EDMLABCCM/pages/4616946342/Case+Activities+Entity+Data+Stream#{name}"
                         ),
                         # "github link": MetadataValue.url(f"https://github.com/cvs-health-source-code/hcm-cm-de-clinical-analytics-nexus-dataform/blob/{client.environment}/definitions/{asset.target.schema.split('_')[4]}/{asset.target.name}.sqlx")
-                        "Asset SQL Code": dg.MetadataValue.md(
-                            f"```sql\n{asset.relation.select_query}\n```"
-                        ),
+                        "Asset SQL Code": sql_metadata,
                     },
-                    group_name=asset.target.schema,
-                    tags={tag: "" for tag in asset.relation.tags},
-                    deps=[target.name for target in asset.relation.dependency_targets],
-                    legacy_freshness_policy=dg.LegacyFreshnessPolicy(
-                        maximum_lag_minutes=fresh_policy_lag_minutes
-                    ),
+                    group_name=target.schema,
+                    tags=dict.fromkeys(relation.tags, ""),
+                    deps=deps,
+                    legacy_freshness_policy=freshness_policy,
                 )
-                assets.append(spec)
-                logger.debug(f"Created asset spec for: {asset.target.name}")
             except Exception as e:
-                logger.error(
-                    f"Failed to create asset spec for {asset.target.name}: {str(e)}"
-                )
+                logger.error("Failed to create asset spec for %s: %s", name, e)
+                continue
 
-        logger.info(f"Successfully created {len(assets)} assets")
-        return assets
+            assets.append(spec)
+            forward_deps[name] = deps
+            logger.debug("Created asset spec for: %s", name)
 
-    def load_dataform_asset_check_specs(
+        return assets, forward_deps
+
+    def _build_asset_checks(
         self,
+        assertion_actions: list[Any],
     ) -> list[dg.AssetChecksDefinition]:
-        logger = dg.get_dagster_logger()
-        logger.info("Starting to load Dataform asset check specs")
+        """Build an asset check definition for each assertion compilation action."""
+        logger = self.logger
 
         asset_checks = []
-        self.create_compilation_result(git_commitish=self.environment)
-        compilation_actions = self.query_compilation_result()
 
-        logger.info(f"Processing {len(compilation_actions)} compilation actions")
+        for asset in assertion_actions:
+            name = asset.target.name
+            asset_key = asset.assertion.parent_action.name
+            if not asset_key:
+                logger.warning("Skipping assertion %s without a parent action", name)
+                continue
+
+            # Convert string to AssetKey
+            asset_key_obj = dg.AssetKey(asset_key)
+
+            try:
+                spec = dg.AssetCheckSpec(
+                    asset=asset_key_obj,  # Use AssetKey object, not string
+                    name=name,
+                )
+
+                definition = dg.AssetChecksDefinition.create(
+                    keys_by_input_name={
+                        "asset_key": asset_key_obj
+                    },  # Use AssetKey object
+                    node_def=dg.OpDefinition(
+                        name=name,
+                        compute_fn=empty_fn,  # We want to simply define the asset check specifications, not a computations for the check. These checks will not be computed on the Dagster side.
+                    ),
+                    check_specs_by_output_name={"spec": spec},
+                    can_subset=False,
+                )
+            except Exception as e:
+                logger.error("Failed to create asset check spec for %s: %s", name, e)
+                continue
+
+            asset_checks.append(definition)
+            logger.debug("Created asset check spec for: %s", name)
 
-        for asset in compilation_actions:
-            if asset.assertion:
-                try:
-                    logger.error(asset.assertion.dependency_targets[0].name)
-                    asset_key = asset.assertion.parent_action.name
-
-                    # Convert string to AssetKey
-                    asset_key_obj = dg.AssetKey(asset_key)
-
-                    spec = dg.AssetCheckSpec(
-                        asset=asset_key_obj,  # Use AssetKey object, not string
-                        name=asset.target.name,
-                    )
-
-                    definition = dg.AssetChecksDefinition.create(
-                        keys_by_input_name={
-                            "asset_key": asset_key_obj
-                        },  # Use AssetKey object
-                        node_def=dg.OpDefinition(
-                            name=asset.target.name,
-                            compute_fn=empty_fn,  # We want to simply define the asset check specifications, not a computations for the check. These checks will not be computed on the Dagster side.
-                        ),
-                        check_specs_by_output_name={"spec": spec},
-                        can_subset=False,
-                    )
-
-                    asset_checks.append(definition)
-                    logger.debug(f"Created asset check spec for: {asset.target.name}")
-                except Exception as e:
-                    logger.error(
-                        f"Failed to create asset check spec for {asset.target.name}: {str(e)}"
-                    )
-
-        logger.error(f"Successfully created {len(asset_checks)} asset check specs")
         return asset_checks
@@ -1,255 +1,49 @@
-from google.cloud import dataform_v1
-from google.protobuf import timestamp_pb2
-from google.type import interval_pb2
 import pytest
-from unittest.mock import Mock
-
-
-def create_compilation_result(
-    git_commitish, default_database, default_schema, default_location, assertion_schema
-):
-    return dataform_v1.CompilationResult(
-        name="test-compilation-result",
-        git_commitish=git_commitish,
-        code_compilation_config=dataform_v1.CodeCompilationConfig(
-            default_database=default_database,
-            default_schema=default_schema,
-            default_location=default_location,
-            assertion_schema=assertion_schema,
-        ),
-    )
-
-
-MOCK_COMPILATION_RESULT_ACTIONS = [
-    dataform_v1.CompilationResultAction(
-        target=dataform_v1.Target(
-            name="test_asset",
-            schema="test_schema",
-            database="test_database",
-        ),
-        relation=dataform_v1.CompilationResultAction.Relation(
-            dependency_targets=[
-                dataform_v1.Target(
-                    name="test_asset_1",
-                    schema="test_schema_1",
-                    database="test-database-1",
-                ),
-                dataform_v1.Target(
-                    name="test_asset_2",
-                    schema="test_schema_2",
-                    database="test-database-2",
-                ),
-            ]
-        ),
-    ),
-    dataform_v1.CompilationResultAction(
-        target=dataform_v1.Target(
-            name="assertion_1",
-            schema="test_schema",
-            database="test_database",
-        ),
-        relation=dataform_v1.CompilationResultAction.Relation(
-            dependency_targets=[
-                dataform_v1.Target(
-                    name="test_asset",
-                    schema="test_schema_1",
-                    database="test-database-1",
-                ),
-            ]
-        ),
-        assertion=dataform_v1.CompilationResultAction.Assertion(
-            dependency_targets=[
-                dataform_v1.Target(
-                    name="test_asset",
-                    schema="test_schema",
-                    database="test_database",
-                ),
-            ],
-            parent_action=dataform_v1.Target(
-                name="test_asset",
-                schema="test_schema",
-                database="test_database",
-            ),
-            select_query="SELECT 1",
-        ),
-    ),
-]
-
-MOCK_WORKFLOW_INVOCATION = dataform_v1.WorkflowInvocation(
-    name="test-workflow-invocation",
-    state=dataform_v1.WorkflowInvocation.State.SUCCEEDED,
-)
-
-MOCK_WORKFLOW_INVOCATION_ACTION_PASSED = dataform_v1.WorkflowInvocationAction(
-    bigquery_action=dataform_v1.WorkflowInvocationAction.BigQueryAction(
-        sql_script="SELECT 1",
-        job_id="test-job-id",
-    ),
-    state=dataform_v1.WorkflowInvocationAction.State.SUCCEEDED,
-    target=dataform_v1.Target(
-        name="test_asset",
-        schema="test_schema",
-        database="test-database",
-    ),
-    internal_metadata='{"labels": {"dataform-action-type": "bigquery_action"}}',
-    invocation_timing=interval_pb2.Interval(
-        start_time=timestamp_pb2.Timestamp(seconds=1723958400),
-        end_time=timestamp_pb2.Timestamp(seconds=1723958400),
-    ),
-)
-
-MOCK_WORKFLOW_INVOCATION_ACTION_FAILED = dataform_v1.WorkflowInvocationAction(
-    bigquery_action=dataform_v1.WorkflowInvocationAction.BigQueryAction(
-        sql_script="SELECT 1",
-        job_id="",
-    ),
-    state=dataform_v1.WorkflowInvocationAction.State.FAILED,
-    target=dataform_v1.Target(
-        name="test_asset",
-        schema="test_schema",
-        database="test-database",
-    ),
-    internal_metadata='{"labels": {"dataform-action-type": "bigquery_action"}}',
-    invocation_timing=interval_pb2.Interval(
-        start_time=timestamp_pb2.Timestamp(seconds=1723958400),
-        end_time=timestamp_pb2.Timestamp(seconds=1723958400),
-    ),
+from dagster_dataform.resources import DataformRepositoryResource
+from dagster_dataform_tests.fixtures import (
+    CLIENT_CONFIGS,
+    DEFAULT_CLIENT_CONFIG,
+    build_mock_dataform_client,
 )
 
-MOCK_WORKFLOW_INVOCATION_ACTION_ASSERTION_FAILED = dataform_v1.WorkflowInvocationAction(
-    bigquery_action=dataform_v1.WorkflowInvocationAction.BigQueryAction(
-        sql_script="SELECT 1",
-        job_id="",
-    ),
-    state=dataform_v1.WorkflowInvocationAction.State.FAILED,
-    target=dataform_v1.Target(
-        name="assertion_1",
-        schema="test_schema",
-        database="test-database",
-    ),
-    internal_metadata='{"labels": {"dataform-action-type": "assertion"}}',
-    failure_reason="Test failure reason",
-    invocation_timing=interval_pb2.Interval(
-        start_time=timestamp_pb2.Timestamp(seconds=1723958400),
-        end_time=timestamp_pb2.Timestamp(seconds=1723958400),
-    ),
-)
 
-MOCK_WORKFLOW_INVOCATION_ACTION_ASSERTION_PASSED = dataform_v1.WorkflowInvocationAction(
-    bigquery_action=dataform_v1.WorkflowInvocationAction.BigQueryAction(
-        sql_script="SELECT 1",
-        job_id="",
-    ),
-    state=dataform_v1.WorkflowInvocationAction.State.SUCCEEDED,
-    target=dataform_v1.Target(
-        name="assertion_1",
-        schema="test_schema",
-        database="test-database",
-    ),
-    internal_metadata='{"labels": {"dataform-action-type": "assertion"}}',
-    invocation_timing=interval_pb2.Interval(
-        start_time=timestamp_pb2.Timestamp(seconds=1723958400),
-        end_time=timestamp_pb2.Timestamp(seconds=1723958400),
-    ),
-)
+def pytest_generate_tests(metafunc):
+    # @pytest.mark.client_config(name="dev", **overrides) selects the mock client config for a test
+    marker = metafunc.definition.get_closest_marker("client_config")
+    if marker is None or "mock_dataform_client" not in metafunc.fixturenames:
+        return
+    name = marker.args[0] if marker.args else "dev"
+    metafunc.parametrize(
+        "mock_dataform_client",
+        [{**CLIENT_CONFIGS[name], **marker.kwargs}],
+        ids=[name],
+        indirect=True,
+    )
 
 
 @pytest.fixture
 def mock_dataform_client(request):
-    # This allows us to parametrize the test with different values for the git commitish, default database, default schema, default location, and assertion schema if necesessary (see test_dataform_repository_resource_get_latest_compilation_result_name_wrong_environment)
-    git_commitish = request.param.get("git_commitish", "test-commitish")
-    default_database = request.param.get("default_database", "test-database")
-    default_schema = request.param.get("default_schema", "test-schema")
-    default_location = request.param.get("default_location", "us-central1")
-    assertion_schema = request.param.get("assertion_schema", "test-assertion-schema")
-    workflow_invocation_type = request.param.get("workflow_invocation_type", None)
+    return build_mock_dataform_client(getattr(request, "param", DEFAULT_CLIENT_CONFIG))
 
-    mock_client = Mock()
 
-    mock_create_compilation_result_response = create_compilation_result(
-        git_commitish,
-        default_database,
-        default_schema,
-        default_location,
-        assertion_schema,
-    )
-    mock_compilation_result_actions = MOCK_COMPILATION_RESULT_ACTIONS
-    mock_workflow_invocation = MOCK_WORKFLOW_INVOCATION
-    mock_workflow_invocation_action_passed = MOCK_WORKFLOW_INVOCATION_ACTION_PASSED
-    mock_workflow_invocation_action_failed = MOCK_WORKFLOW_INVOCATION_ACTION_FAILED
-    mock_workflow_invocation_action_assertion_passed = (
-        MOCK_WORKFLOW_INVOCATION_ACTION_ASSERTION_PASSED
-    )
-    mock_workflow_invocation_action_assertion_failed = (
-        MOCK_WORKFLOW_INVOCATION_ACTION_ASSERTION_FAILED
-    )
+@pytest.fixture(scope="module")
+def module_dataform_client():
+    return build_mock_dataform_client(DEFAULT_CLIENT_CONFIG)
 
-    mock_query_compilation_result_actions_response = (
-        dataform_v1.QueryCompilationResultActionsResponse(
-            compilation_result_actions=mock_compilation_result_actions
-        )
-    )
 
-    mock_list_compilation_results_response = dataform_v1.ListCompilationResultsResponse(
-        compilation_results=[mock_create_compilation_result_response]
-    )
-
-    mock_list_workflow_invocations_response = [mock_workflow_invocation]
+@pytest.fixture
+def default_dataform_client(module_dataform_client):
+    # The mock is built once per module with DEFAULT_CLIENT_CONFIG; only its recorded calls are reset between tests
+    module_dataform_client.reset_mock()
+    return module_dataform_client
 
-    if workflow_invocation_type == "asset_passed":
-        mock_query_workflow_invocation_actions_response = (
-            dataform_v1.QueryWorkflowInvocationActionsResponse(
-                workflow_invocation_actions=[mock_workflow_invocation_action_passed]
-            )
-        )
-    elif workflow_invocation_type == "asset_failed":
-        mock_query_workflow_invocation_actions_response = (
-            dataform_v1.QueryWorkflowInvocationActionsResponse(
-                workflow_invocation_actions=[mock_workflow_invocation_action_failed]
-            )
-        )
-    elif workflow_invocation_type == "assertion_passed":
-        mock_query_workflow_invocation_actions_response = (
-            dataform_v1.QueryWorkflowInvocationActionsResponse(
-                workflow_invocation_actions=[
-                    mock_workflow_invocation_action_assertion_passed
-                ]
-            )
-        )
-    elif workflow_invocation_type == "assertion_failed":
-        mock_query_workflow_invocation_actions_response = (
-            dataform_v1.QueryWorkflowInvocationActionsResponse(
-                workflow_invocation_actions=[
-                    mock_workflow_invocation_action_assertion_failed
-                ]
-            )
-        )
-    else:
-        mock_query_workflow_invocation_actions_response = (
-            dataform_v1.QueryWorkflowInvocationActionsResponse(
-                workflow_invocation_actions=[mock_workflow_invocation_action_passed]
-            )
-        )
 
-    mock_get_workflow_invocation_response = mock_workflow_invocation
-    mock_client.create_compilation_result.return_value = (
-        mock_create_compilation_result_response
-    )
-    mock_client.list_compilation_results.return_value = (
-        mock_list_compilation_results_response
-    )
-    mock_client.query_compilation_result_actions.return_value = (
-        mock_query_compilation_result_actions_response
-    )
-    mock_client.list_workflow_invocations.return_value = (
-        mock_list_workflow_invocations_response
-    )
-    mock_client.query_workflow_invocation_actions.return_value = (
-        mock_query_workflow_invocation_actions_response
-    )
-    mock_client.create_workflow_invocation.return_value = mock_workflow_invocation
-    mock_client.get_workflow_invocation.return_value = (
-        mock_get_workflow_invocation_response
+@pytest.fixture
+def resource(default_dataform_client):
+    return DataformRepositoryResource(
+        project_id="test-project",
+        repository_id="test-repo",
+        location="us-central1",
+        environment="dev",
+        client=default_dataform_client,
     )
-
-    return mock_client
@@ -0,0 +1,293 @@
+"""Canned Dataform protos, mock client configurations and a fake Dataform client shared by the tests."""
+
+from functools import cache
+from unittest.mock import call
+
+from google.cloud import dataform_v1
+from google.protobuf import timestamp_pb2
+from google.type import interval_pb2
+
+
+# Canned protos are shared by every mock client in the session; tests must not mutate them
+@cache
+def create_compilation_result(
+    git_commitish,
+    default_database,
+    default_schema,
+    default_location,
+    assertion_schema,
+    table_prefix="",
+):
+    return dataform_v1.CompilationResult(
+        name="test-compilation-result",
+        git_commitish=git_commitish,
+        code_compilation_config=dataform_v1.CodeCompilationConfig(
+            default_database=default_database,
+            default_schema=default_schema,
+            default_location=default_location,
+            assertion_schema=assertion_schema,
+            table_prefix=table_prefix,
+        ),
+    )
+
+
+MOCK_COMPILATION_RESULT_ACTIONS = [
+    dataform_v1.CompilationResultAction(
+        target=dataform_v1.Target(
+            name="test_asset",
+            schema="test_schema",
+            database="test_database",
+        ),
+        relation=dataform_v1.CompilationResultAction.Relation(
+            dependency_targets=[
+                dataform_v1.Target(
+                    name="test_asset_1",
+                    schema="test_schema_1",
+                    database="test-database-1",
+                ),
+                dataform_v1.Target(
+                    name="test_asset_2",
+                    schema="test_schema_2",
+                    database="test-database-2",
+                ),
+            ]
+        ),
+    ),
+    dataform_v1.CompilationResultAction(
+        target=dataform_v1.Target(
+            name="assertion_1",
+            schema="test_schema",
+            database="test_database",
+        ),
+        relation=dataform_v1.CompilationResultAction.Relation(
+            dependency_targets=[
+                dataform_v1.Target(
+                    name="test_asset",
+                    schema="test_schema_1",
+                    database="test-database-1",
+                ),
+            ]
+        ),
+        assertion=dataform_v1.CompilationResultAction.Assertion(
+            dependency_targets=[
+                dataform_v1.Target(
+                    name="test_asset",
+                    schema="test_schema",
+                    database="test_database",
+                ),
+            ],
+            parent_action=dataform_v1.Target(
+                name="test_asset",
+                schema="test_schema",
+                database="test_database",
+            ),
+            select_query="SELECT 1",
+        ),
+    ),
+]
+
+MOCK_WORKFLOW_INVOCATION = dataform_v1.WorkflowInvocation(
+    name="test-workflow-invocation",
+    state=dataform_v1.WorkflowInvocation.State.SUCCEEDED,
+)
+
+MOCK_WORKFLOW_INVOCATION_ACTION_PASSED = dataform_v1.WorkflowInvocationAction(
+    bigquery_action=dataform_v1.WorkflowInvocationAction.BigQueryAction(
+        sql_script="SELECT 1",
+        job_id="test-job-id",
+    ),
+    state=dataform_v1.WorkflowInvocationAction.State.SUCCEEDED,
+    target=dataform_v1.Target(
+        name="test_asset",
+        schema="test_schema",
+        database="test-database",
+    ),
+    internal_metadata='{"labels": {"dataform-action-type": "bigquery_action"}}',
+    invocation_timing=interval_pb2.Interval(
+        start_time=timestamp_pb2.Timestamp(seconds=1723958400),
+        end_time=timestamp_pb2.Timestamp(seconds=1723958400),
+    ),
+)
+
+MOCK_WORKFLOW_INVOCATION_ACTION_FAILED = dataform_v1.WorkflowInvocationAction(
+    bigquery_action=dataform_v1.WorkflowInvocationAction.BigQueryAction(
+        sql_script="SELECT 1",
+        job_id="",
+    ),
+    state=dataform_v1.WorkflowInvocationAction.State.FAILED,
+    target=dataform_v1.Target(
+        name="test_asset",
+        schema="test_schema",
+        database="test-database",
+    ),
+    internal_metadata='{"labels": {"dataform-action-type": "bigquery_action"}}',
+    invocation_timing=interval_pb2.Interval(
+        start_time=timestamp_pb2.Timestamp(seconds=1723958400),
+        end_time=timestamp_pb2.Timestamp(seconds=1723958400),
+    ),
+)
+
+MOCK_WORKFLOW_INVOCATION_ACTION_ASSERTION_FAILED = dataform_v1.WorkflowInvocationAction(
+    bigquery_action=dataform_v1.WorkflowInvocationAction.BigQueryAction(
+        sql_script="SELECT 1",
+        job_id="",
+    ),
+    state=dataform_v1.WorkflowInvocationAction.State.FAILED,
+    target=dataform_v1.Target(
+        name="assertion_1",
+        schema="test_schema",
+        database="test-database",
+    ),
+    internal_metadata='{"labels": {"dataform-action-type": "assertion"}}',
+    failure_reason="Test failure reason",
+    invocation_timing=interval_pb2.Interval(
+        start_time=timestamp_pb2.Timestamp(seconds=1723958400),
+        end_time=timestamp_pb2.Timestamp(seconds=1723958400),
+    ),
+)
+
+MOCK_WORKFLOW_INVOCATION_ACTION_ASSERTION_PASSED = dataform_v1.WorkflowInvocationAction(
+    bigquery_action=dataform_v1.WorkflowInvocationAction.BigQueryAction(
+        sql_script="SELECT 1",
+        job_id="",
+    ),
+    state=dataform_v1.WorkflowInvocationAction.State.SUCCEEDED,
+    target=dataform_v1.Target(
+        name="assertion_1",
+        schema="test_schema",
+        database="test-database",
+    ),
+    internal_metadata='{"labels": {"dataform-action-type": "assertion"}}',
+    invocation_timing=interval_pb2.Interval(
+        start_time=timestamp_pb2.Timestamp(seconds=1723958400),
+        end_time=timestamp_pb2.Timestamp(seconds=1723958400),
+    ),
+)
+
+MOCK_QUERY_COMPILATION_RESULT_ACTIONS_RESPONSE = (
+    dataform_v1.QueryCompilationResultActionsResponse(
+        compilation_result_actions=MOCK_COMPILATION_RESULT_ACTIONS
+    )
+)
+
+MOCK_QUERY_WORKFLOW_INVOCATION_ACTIONS_RESPONSES = {
+    workflow_invocation_type: dataform_v1.QueryWorkflowInvocationActionsResponse(
+        workflow_invocation_actions=[workflow_invocation_action]
+    )
+    for workflow_invocation_type, workflow_invocation_action in {
+        "asset_passed": MOCK_WORKFLOW_INVOCATION_ACTION_PASSED,
+        "asset_failed": MOCK_WORKFLOW_INVOCATION_ACTION_FAILED,
+        "assertion_passed": MOCK_WORKFLOW_INVOCATION_ACTION_ASSERTION_PASSED,
+        "assertion_failed": MOCK_WORKFLOW_INVOCATION_ACTION_ASSERTION_FAILED,
+    }.items()
+}
+
+
+_BASE_CLIENT_CONFIG = {
+    "git_commitish": "test-commitish",
+    "default_database": "test-database",
+    "default_schema": "test-schema",
+    "default_location": "us-central1",
+    "assertion_schema": "test-assertion-schema",
+}
+
+# Named mock client configurations; tests select one with the client_config marker
+CLIENT_CONFIGS = {
+    "default": _BASE_CLIENT_CONFIG,
+    "dev": {**_BASE_CLIENT_CONFIG, "git_commitish": "dev"},
+}
+
+DEFAULT_CLIENT_CONFIG = CLIENT_CONFIGS["dev"]
+
+
+class Recorder:
+    """Records the calls made to one client method and returns a canned value."""
+
+    __slots__ = ("call_args_list", "return_value")
+
+    def __init__(self):
+        self.return_value = None
+        self.call_args_list = []
+
+    def __call__(self, *args, **kwargs):
+        self.call_args_list.append(call(*args, **kwargs))
+        return self.return_value
+
+    @property
+    def call_count(self):
+        return len(self.call_args_list)
+
+    def assert_not_called(self):
+        assert self.call_count == 0, f"Expected no calls, got {self.call_args_list}"
+
+    def assert_called_once(self):
+        assert self.call_count == 1, f"Expected one call, got {self.call_args_list}"
+
+    def assert_called_with(self, *args, **kwargs):
+        assert self.call_args_list, "Expected a call, got none"
+        expected = call(*args, **kwargs)
+        assert self.call_args_list[-1] == expected, (
+            f"Expected {expected}, got {self.call_args_list[-1]}"
+        )
+
+    def assert_called_once_with(self, *args, **kwargs):
+        self.assert_called_once()
+        self.assert_called_with(*args, **kwargs)
+
+    def reset_mock(self):
+        self.call_args_list = []
+
+
+class FakeDataformClient:
+    """Stand-in for dataform_v1.DataformClient exposing only the RPCs the resource uses."""
+
+    __slots__ = (
+        "create_compilation_result",
+        "create_workflow_invocation",
+        "get_workflow_invocation",
+        "list_compilation_results",
+        "list_workflow_invocations",
+        "query_compilation_result_actions",
+        "query_workflow_invocation_actions",
+    )
+
+    def __init__(self):
+        for method in self.__slots__:
+            setattr(self, method, Recorder())
+
+    def reset_mock(self):
+        for method in self.__slots__:
+            getattr(self, method).reset_mock()
+
+
+def build_mock_dataform_client(config):
+    workflow_invocation_type = config.get("workflow_invocation_type", "asset_passed")
+
+    mock_client = FakeDataformClient()
+
+    mock_create_compilation_result_response = create_compilation_result(
+        config.get("git_commitish", "test-commitish"),
+        config.get("default_database", "test-database"),
+        config.get("default_schema", "test-schema"),
+        config.get("default_location", "us-central1"),
+        config.get("assertion_schema", "test-assertion-schema"),
+        config.get("table_prefix", ""),
+    )
+
+    mock_client.create_compilation_result.return_value = (
+        mock_create_compilation_result_response
+    )
+    mock_client.list_compilation_results.return_value = [
+        mock_create_compilation_result_response
+    ]
+    mock_client.query_compilation_result_actions.return_value = (
+        MOCK_QUERY_COMPILATION_RESULT_ACTIONS_RESPONSE
+    )
+    mock_client.list_workflow_invocations.return_value = [MOCK_WORKFLOW_INVOCATION]
+    mock_client.query_workflow_invocation_actions.return_value = (
+        MOCK_QUERY_WORKFLOW_INVOCATION_ACTIONS_RESPONSES[workflow_invocation_type]
+    )
+    mock_client.create_workflow_invocation.return_value = MOCK_WORKFLOW_INVOCATION
+    mock_client.get_workflow_invocation.return_value = MOCK_WORKFLOW_INVOCATION
+
+    return mock_client
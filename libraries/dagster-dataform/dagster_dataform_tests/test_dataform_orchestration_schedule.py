@@ -7,19 +7,7 @@ from dagster import build_schedule_context
 import pytest
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "test-commitish",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
+@pytest.mark.client_config("default")
 def test_dataform_orchestration_schedule_creates_schedule_and_job(mock_dataform_client):
     resource = DataformRepositoryResource(
         project_id="test-project",
@@ -43,19 +31,7 @@ def test_dataform_orchestration_schedule_creates_schedule_and_job(mock_dataform_
     assert schedule.job.name == "dataform_workflow_invocation_job"
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "test-commitish",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
+@pytest.mark.client_config("default")
 def test_dataform_orchestration_schedule_tick_creates_run_request(mock_dataform_client):
     resource = DataformRepositoryResource(
         project_id="test-project",
@@ -79,19 +55,7 @@ def test_dataform_orchestration_schedule_tick_creates_run_request(mock_dataform_
     assert len(result.run_requests) == 1
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "test-commitish",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
+@pytest.mark.client_config("default")
 def test_dataform_orchestration_schedule_with_parameters(mock_dataform_client):
     resource = DataformRepositoryResource(
         project_id="test-project",
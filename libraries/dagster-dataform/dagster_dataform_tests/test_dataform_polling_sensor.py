@@ -8,19 +8,7 @@ import pytest
 import json
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
+@pytest.mark.client_config()
 def test_dataform_polling_sensor_creates_sensor_and_job(mock_dataform_client):
     resource = DataformRepositoryResource(
         project_id="test-project",
@@ -41,19 +29,7 @@ def test_dataform_polling_sensor_creates_sensor_and_job(mock_dataform_client):
     assert len(sensor.jobs) == 2
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
+@pytest.mark.client_config()
 def test_dataform_polling_sensor_creates_sensor_and_job_when_passed_job(
     mock_dataform_client,
 ):
@@ -80,19 +56,7 @@ def test_dataform_polling_sensor_creates_sensor_and_job_when_passed_job(
     assert len(sensor.jobs) == 2
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
+@pytest.mark.client_config()
 def test_dataform_polling_sensor_returns_sensor_result_cursor_updated(
     mock_dataform_client,
 ):
@@ -126,19 +90,7 @@ def test_dataform_polling_sensor_returns_sensor_result_cursor_updated(
     assert result.asset_events[0].metadata["BigQuery JobID"] is not None
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
+@pytest.mark.client_config()
 def test_dataform_polling_sensor_returns_sensor_result_cursor_not_updated(
     mock_dataform_client,
 ):
@@ -168,20 +120,7 @@ def test_dataform_polling_sensor_returns_sensor_result_cursor_not_updated(
     assert len(result.asset_events) == 0
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-            "workflow_invocation_type": "asset_failed",
-        }
-    ],
-    indirect=True,
-)
+@pytest.mark.client_config(workflow_invocation_type="asset_failed")
 def test_dataform_polling_sensor_returns_asset_observation_when_asset_failed(
     mock_dataform_client,
 ):
@@ -217,20 +156,7 @@ def test_dataform_polling_sensor_returns_asset_observation_when_asset_failed(
     assert len(result.run_requests) == 1
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-            "workflow_invocation_type": "assertion_passed",
-        }
-    ],
-    indirect=True,
-)
+@pytest.mark.client_config(workflow_invocation_type="assertion_passed")
 def test_dataform_polling_sensor_returns_asset_check_evaluation_when_assertion_passed(
     mock_dataform_client,
 ):
@@ -270,20 +196,7 @@ def test_dataform_polling_sensor_returns_asset_check_evaluation_when_assertion_p
     assert len(result.run_requests) == 0
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-            "workflow_invocation_type": "assertion_failed",
-        }
-    ],
-    indirect=True,
-)
+@pytest.mark.client_config(workflow_invocation_type="assertion_failed")
 def test_dataform_polling_sensor_returns_asset_check_evaluation_when_assertion_failed(
     mock_dataform_client,
 ):
@@ -1,32 +1,93 @@
+import asyncio
+import weakref
+from unittest.mock import AsyncMock, Mock
+from dagster_dataform import resources
 from dagster_dataform.resources import DataformRepositoryResource
-from dagster_dataform.utils import get_epoch_time_ago
+from dagster_dataform_tests.fixtures import (
+    MOCK_COMPILATION_RESULT_ACTIONS,
+    MOCK_WORKFLOW_INVOCATION_ACTION_PASSED,
+)
 import pytest
 from google.cloud import dataform_v1
-from dagster import AssetSpec, AssetChecksDefinition
+from dagster import AssetSpec, AssetChecksDefinition, MetadataValue
 
+REPOSITORY_PATH = "projects/test-project/locations/us-central1/repositories/test-repo"
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "test-commitish",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
+FROZEN_EPOCH_SECONDS = 1_700_000_000
+
+EXPECTED_LIST_COMPILATION_RESULTS_REQUEST = dataform_v1.ListCompilationResultsRequest(
+    parent=REPOSITORY_PATH,
+    page_size=10,
+    order_by="create_time desc",
+    filter='git_commitish="dev"',
 )
-def test_dataform_repository_resource_initialization(mock_dataform_client):
-    resource = DataformRepositoryResource(
-        project_id="test-project",
-        repository_id="test-repo",
-        location="us-central1",
-        environment="dev",
-        client=mock_dataform_client,
+
+EXPECTED_LIST_WORKFLOW_REQUEST = dataform_v1.ListWorkflowInvocationsRequest(
+    parent=REPOSITORY_PATH,
+    page_size=1000,
+    filter=f"invocation_timing.start_time.seconds > {FROZEN_EPOCH_SECONDS - 10 * 60}",
+)
+
+EXPECTED_QUERY_COMPILATION_RESULT_ACTIONS_REQUEST = (
+    dataform_v1.QueryCompilationResultActionsRequest(
+        name="test-compilation-result",
+    )
+)
+
+EXPECTED_QUERY_WORKFLOW_INVOCATION_REQUEST = (
+    dataform_v1.QueryWorkflowInvocationActionsRequest(
+        name="test-workflow-invocation",
+    )
+)
+
+EXPECTED_QUERY_WORKFLOW_INVOCATION_RESPONSE = (
+    dataform_v1.QueryWorkflowInvocationActionsResponse(
+        workflow_invocation_actions=[MOCK_WORKFLOW_INVOCATION_ACTION_PASSED]
+    )
+)
+
+EXPECTED_CREATE_WORKFLOW_REQUEST = dataform_v1.CreateWorkflowInvocationRequest(
+    parent=REPOSITORY_PATH,
+    workflow_invocation=dataform_v1.WorkflowInvocation(
+        compilation_result="test-compilation-result",
+    ),
+)
+
+EXPECTED_CREATE_WORKFLOW_REQUEST_SELECTIVE = (
+    dataform_v1.CreateWorkflowInvocationRequest(
+        parent=REPOSITORY_PATH,
+        workflow_invocation=dataform_v1.WorkflowInvocation(
+            compilation_result="test-compilation-result",
+            invocation_config=dataform_v1.InvocationConfig(
+                included_targets=[
+                    dataform_v1.Target(name="target_1"),
+                    dataform_v1.Target(database="db", schema="schema", name="target_2"),
+                ],
+                included_tags=["tag_1", "tag_2"],
+                transitive_dependencies_included=True,
+                transitive_dependents_included=False,
+                fully_refresh_incremental_tables_enabled=False,
+            ),
+        ),
+    )
+)
+
+EXPECTED_GET_WORKFLOW_INVOCATION_REQUEST = dataform_v1.GetWorkflowInvocationRequest(
+    name="test-workflow-invocation",
+)
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch):
+    # Pin the clock so the list workflow invocations filter matches EXPECTED_LIST_WORKFLOW_REQUEST
+    monkeypatch.setattr(
+        resources,
+        "get_epoch_time_ago",
+        lambda minutes: FROZEN_EPOCH_SECONDS - minutes * 60,
     )
 
+
+def test_dataform_repository_resource_initialization(resource):
     assert resource is not None
     assert resource.project_id == "test-project"
     assert resource.location == "us-central1"
@@ -35,19 +96,7 @@ def test_dataform_repository_resource_initialization(mock_dataform_client):
     assert resource.sensor_minimum_interval_seconds == 120
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "test-commitish",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
+@pytest.mark.client_config("default")
 def test_dataform_repository_resource_create_compilation_result(mock_dataform_client):
     resource = DataformRepositoryResource(
         project_id="test-project",
@@ -79,131 +128,123 @@ def test_dataform_repository_resource_create_compilation_result(mock_dataform_cl
 
 
 @pytest.mark.parametrize(
-    "mock_dataform_client",
+    "compilation_result, expected",
     [
-        {
-            "git_commitish": "test-commitish",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
+        (dataform_v1.CompilationResult(git_commitish="dev"), True),
+        (dataform_v1.CompilationResult(git_commitish="test-commitish"), False),
+        (
+            dataform_v1.CompilationResult(
+                git_commitish="dev",
+                code_compilation_config=dataform_v1.CodeCompilationConfig(
+                    table_prefix="pr_123"
+                ),
+            ),
+            False,
+        ),
     ],
-    indirect=True,
+    ids=["matching", "wrong_environment", "table_prefix"],
 )
-def test_dataform_repository_resource_get_latest_compilation_result_name_wrong_environment(
-    mock_dataform_client,
-):
-    resource = DataformRepositoryResource(
-        project_id="test-project",
-        repository_id="test-repo",
-        location="us-central1",
-        environment="dev",
-        client=mock_dataform_client,
-    )
-
-    compilation_result = resource.get_latest_compilation_result_name()
-
-    assert compilation_result is None
+def test_matches_environment(compilation_result, expected):
+    assert resources._matches_environment(compilation_result, "dev") is expected
 
 
 @pytest.mark.parametrize(
-    "mock_dataform_client",
+    "value, expected",
     [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
+        ("dev", '"dev"'),
+        ('feature/"quoted"', '"feature/\\"quoted\\""'),
+        ("back\\slash", '"back\\\\slash"'),
     ],
-    indirect=True,
+    ids=["plain", "double_quote", "backslash"],
 )
-def test_dataform_repository_resource_get_latest_compilation_result_name_correct_environment(
-    mock_dataform_client,
+def test_quote_filter_value(value, expected):
+    assert resources._quote_filter_value(value) == expected
+
+
+def test_dataform_repository_resource_get_latest_compilation_result_name(
+    default_dataform_client, resource
 ):
-    resource = DataformRepositoryResource(
-        project_id="test-project",
-        repository_id="test-repo",
-        location="us-central1",
-        environment="dev",
-        client=mock_dataform_client,
+    assert resource.get_latest_compilation_result_name() == "test-compilation-result"
+    default_dataform_client.list_compilation_results.assert_called_once_with(
+        request=EXPECTED_LIST_COMPILATION_RESULTS_REQUEST,
+        metadata=[
+            (
+                "x-goog-fieldmask",
+                "compilationResults.name,compilationResults.gitCommitish,compilationResults.codeCompilationConfig.tablePrefix,nextPageToken",
+            )
+        ],
     )
 
-    compilation_result = resource.get_latest_compilation_result_name()
 
-    assert compilation_result is not None
-    assert compilation_result == "test-compilation-result"
+def test_dataform_repository_resource_get_latest_compilation_result_name_scans_one_page(
+    default_dataform_client, resource, monkeypatch
+):
+    scanned = []
 
+    def pager():
+        # Every result has a table prefix, so none of them match the environment
+        for i in range(25):
+            scanned.append(i)
+            yield dataform_v1.CompilationResult(
+                name=f"compilation-result-{i}",
+                git_commitish="dev",
+                code_compilation_config=dataform_v1.CodeCompilationConfig(
+                    table_prefix="pr"
+                ),
+            )
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
-def test_dataform_repository_resource_query_compilation_result(mock_dataform_client):
-    resource = DataformRepositoryResource(
-        project_id="test-project",
-        repository_id="test-repo",
-        location="us-central1",
-        environment="dev",
-        client=mock_dataform_client,
+    # The client is shared across the module, so the canned response is restored afterwards
+    monkeypatch.setattr(
+        default_dataform_client.list_compilation_results, "return_value", pager()
     )
 
+    assert resource.get_latest_compilation_result_name() is None
+    assert len(scanned) == 10
+
+
+def test_dataform_repository_resource_query_compilation_result(
+    default_dataform_client, resource
+):
     compilation_result_actions = resource.query_compilation_result()
 
-    assert compilation_result_actions is not None
-    assert len(compilation_result_actions) == 2
-    # Access the attributes through the mock response object
-    assert hasattr(compilation_result_actions[0], "target")
-    assert hasattr(compilation_result_actions[0].target, "name")
-    assert hasattr(compilation_result_actions[0].target, "schema")
-    assert hasattr(compilation_result_actions[0].target, "database")
+    assert list(compilation_result_actions) == MOCK_COMPILATION_RESULT_ACTIONS
+    # Public callers get full actions, so no field mask is sent
+    default_dataform_client.query_compilation_result_actions.assert_called_once_with(
+        request=EXPECTED_QUERY_COMPILATION_RESULT_ACTIONS_REQUEST, metadata=[]
+    )
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
-def test_dataform_repository_resource_get_latest_workflow_invocations(
-    mock_dataform_client,
+def test_dataform_repository_resource_compilation_queries_masked_actions(
+    default_dataform_client, resource
 ):
-    resource = DataformRepositoryResource(
-        project_id="test-project",
-        repository_id="test-repo",
-        location="us-central1",
-        environment="dev",
-        client=mock_dataform_client,
+    assert len(resource.assets) == 1
+
+    default_dataform_client.query_compilation_result_actions.assert_called_once_with(
+        request=EXPECTED_QUERY_COMPILATION_RESULT_ACTIONS_REQUEST,
+        metadata=[
+            (
+                "x-goog-fieldmask",
+                (
+                    "compilationResultActions.target,"
+                    "compilationResultActions.relation.tags,"
+                    "compilationResultActions.relation.dependencyTargets,"
+                    "compilationResultActions.relation.selectQuery,"
+                    "compilationResultActions.assertion.parentAction,"
+                    "compilationResultActions.assertion.selectQuery,"
+                    "nextPageToken"
+                ),
+            )
+        ],
     )
 
-    workflow_invocations = resource.get_latest_workflow_invocations(minutes_ago=10)
 
-    expected_request = dataform_v1.ListWorkflowInvocationsRequest(
-        parent="projects/test-project/locations/us-central1/repositories/test-repo",
-        page_size=1000,
-        filter=f"invocation_timing.start_time.seconds > {get_epoch_time_ago(minutes=10)}",
-    )
+def test_dataform_repository_resource_get_latest_workflow_invocations(
+    default_dataform_client, resource
+):
+    workflow_invocations = resource.get_latest_workflow_invocations(minutes_ago=10)
 
-    mock_dataform_client.list_workflow_invocations.assert_called_once_with(
-        request=expected_request
+    default_dataform_client.list_workflow_invocations.assert_called_once_with(
+        request=EXPECTED_LIST_WORKFLOW_REQUEST
     )
 
     assert workflow_invocations is not None
@@ -211,125 +252,38 @@ def test_dataform_repository_resource_get_latest_workflow_invocations(
     assert workflow_invocations[0].name == "test-workflow-invocation"  # pyright: ignore[reportIndexIssue]
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
-def test_dataform_repository_resource_query_workflow_invocation(mock_dataform_client):
-    resource = DataformRepositoryResource(
-        project_id="test-project",
-        repository_id="test-repo",
-        location="us-central1",
-        environment="dev",
-        client=mock_dataform_client,
-    )
-
+def test_dataform_repository_resource_query_workflow_invocation(
+    default_dataform_client, resource
+):
     workflow_invocation = resource.query_workflow_invocation(
         name="test-workflow-invocation"
     )
 
-    expected_request = dataform_v1.QueryWorkflowInvocationActionsRequest(
-        name="test-workflow-invocation",
-    )
-
-    mock_dataform_client.query_workflow_invocation_actions.assert_called_once_with(
-        request=expected_request
-    )
-
-    assert workflow_invocation is not None
-    assert hasattr(workflow_invocation, "workflow_invocation_actions")
-    assert len(workflow_invocation.workflow_invocation_actions) == 1
-    assert (
-        workflow_invocation.workflow_invocation_actions[0].state
-        == dataform_v1.WorkflowInvocationAction.State.SUCCEEDED
-    )
-    assert (
-        workflow_invocation.workflow_invocation_actions[0].target.name == "test_asset"
-    )
-    assert (
-        workflow_invocation.workflow_invocation_actions[0].target.schema
-        == "test_schema"
-    )
-    assert (
-        workflow_invocation.workflow_invocation_actions[0].target.database
-        == "test-database"
+    default_dataform_client.query_workflow_invocation_actions.assert_called_once_with(
+        request=EXPECTED_QUERY_WORKFLOW_INVOCATION_REQUEST
     )
 
+    assert workflow_invocation == EXPECTED_QUERY_WORKFLOW_INVOCATION_RESPONSE
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
-def test_dataform_repository_resource_create_workflow_invocation(mock_dataform_client):
-    resource = DataformRepositoryResource(
-        project_id="test-project",
-        repository_id="test-repo",
-        location="us-central1",
-        environment="dev",
-        client=mock_dataform_client,
-    )
 
+def test_dataform_repository_resource_create_workflow_invocation(
+    default_dataform_client, resource
+):
     workflow_invocation = resource.create_workflow_invocation(
         compilation_result_name="test-compilation-result"
     )
 
-    expected_request = dataform_v1.CreateWorkflowInvocationRequest(
-        parent="projects/test-project/locations/us-central1/repositories/test-repo",
-        workflow_invocation=dataform_v1.WorkflowInvocation(
-            compilation_result="test-compilation-result",
-        ),
-    )
-
-    mock_dataform_client.create_workflow_invocation.assert_called_once_with(
-        request=expected_request
+    default_dataform_client.create_workflow_invocation.assert_called_once_with(
+        request=EXPECTED_CREATE_WORKFLOW_REQUEST
     )
 
     assert workflow_invocation is not None
     assert workflow_invocation.name == "test-workflow-invocation"
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
 def test_dataform_repository_resource_create_workflow_invocation_with_selective_execution(
-    mock_dataform_client,
+    default_dataform_client, resource
 ):
-    resource = DataformRepositoryResource(
-        project_id="test-project",
-        repository_id="test-repo",
-        location="us-central1",
-        environment="dev",
-        client=mock_dataform_client,
-    )
-
     workflow_invocation = resource.create_workflow_invocation(
         compilation_result_name="test-compilation-result",
         included_targets=[
@@ -339,65 +293,23 @@ def test_dataform_repository_resource_create_workflow_invocation_with_selective_
         included_tags=["tag_1", "tag_2"],
     )
 
-    expected_request = dataform_v1.CreateWorkflowInvocationRequest(
-        parent="projects/test-project/locations/us-central1/repositories/test-repo",
-        workflow_invocation=dataform_v1.WorkflowInvocation(
-            compilation_result="test-compilation-result",
-            invocation_config=dataform_v1.InvocationConfig(
-                included_targets=[
-                    dataform_v1.Target(name="target_1"),
-                    dataform_v1.Target(database="db", schema="schema", name="target_2"),
-                ],
-                included_tags=["tag_1", "tag_2"],
-                transitive_dependencies_included=True,
-                transitive_dependents_included=False,
-                fully_refresh_incremental_tables_enabled=False,
-            ),
-        ),
-    )
-
-    mock_dataform_client.create_workflow_invocation.assert_called_once_with(
-        request=expected_request
+    default_dataform_client.create_workflow_invocation.assert_called_once_with(
+        request=EXPECTED_CREATE_WORKFLOW_REQUEST_SELECTIVE
     )
 
     assert workflow_invocation is not None
     assert workflow_invocation.name == "test-workflow-invocation"
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
 def test_dataform_repository_resource_get_workflow_invocation_details(
-    mock_dataform_client,
+    default_dataform_client, resource
 ):
-    resource = DataformRepositoryResource(
-        project_id="test-project",
-        repository_id="test-repo",
-        location="us-central1",
-        environment="dev",
-        client=mock_dataform_client,
-    )
-
     workflow_invocation_details = resource.get_workflow_invocation_details(
         workflow_invocation_name="test-workflow-invocation"
     )
 
-    expected_request = dataform_v1.GetWorkflowInvocationRequest(
-        name="test-workflow-invocation",
-    )
-
-    mock_dataform_client.get_workflow_invocation.assert_called_once_with(
-        request=expected_request
+    default_dataform_client.get_workflow_invocation.assert_called_once_with(
+        request=EXPECTED_GET_WORKFLOW_INVOCATION_REQUEST
     )
 
     assert workflow_invocation_details is not None
@@ -408,32 +320,12 @@ def test_dataform_repository_resource_get_workflow_invocation_details(
     )
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
-def test_dataform_repository_resource_load_dataform_assets(mock_dataform_client):
-    resource = DataformRepositoryResource(
-        project_id="test-project",
-        repository_id="test-repo",
-        location="us-central1",
-        environment="dev",
-        client=mock_dataform_client,
-    )
-
+def test_dataform_repository_resource_load_dataform_assets(resource):
     assets = resource.assets
 
     assert assets is not None
-    assert len(assets) == 2
+    # Assertion actions are loaded as asset checks, not as assets
+    assert len(assets) == 1
     assert isinstance(assets[0], AssetSpec)
     assert assets[0].kinds == {"bigquery"}
     assert assets[0].metadata["Project ID"] == "test_database"
@@ -441,20 +333,61 @@ def test_dataform_repository_resource_load_dataform_assets(mock_dataform_client)
     assert assets[0].metadata["Asset Name"] == "test_asset"
 
 
-@pytest.mark.parametrize(
-    "mock_dataform_client",
-    [
-        {
-            "git_commitish": "dev",
-            "default_database": "test-database",
-            "default_schema": "test-schema",
-            "default_location": "us-central1",
-            "assertion_schema": "test-assertion-schema",
-        }
-    ],
-    indirect=True,
-)
-def test_dataform_repository_resource_load_dataform_asset_checks(mock_dataform_client):
+def test_dataform_repository_resource_load_dataform_asset_checks(resource):
+    asset_checks = resource.asset_checks
+
+    assert asset_checks is not None
+    assert len(asset_checks) == 1
+    assert isinstance(asset_checks[0], AssetChecksDefinition)
+    assert asset_checks[0].check_specs_by_output_name["spec"].name == "assertion_1"
+    assert asset_checks[0].keys_by_input_name["asset_key"].path[0] == "test_asset"
+
+
+@pytest.mark.parametrize("attr", ["assets", "asset_checks"])
+def test_dataform_repository_resource_lazy_load(
+    default_dataform_client, resource, attr
+):
+    assert "_dataform_definitions" not in resource.__dict__
+    default_dataform_client.create_compilation_result.assert_not_called()
+
+    value = getattr(resource, attr)
+
+    assert "_dataform_definitions" in resource.__dict__
+    assert len(value) >= 1
+    default_dataform_client.create_compilation_result.assert_called_once()
+    default_dataform_client.list_compilation_results.assert_not_called()
+    default_dataform_client.query_compilation_result_actions.assert_called_once()
+
+
+def test_dataform_repository_resource_invalidate_recompiles(
+    default_dataform_client, resource
+):
+    assert resource.assets is resource.assets
+    assert resource.asset_checks is resource.asset_checks
+    default_dataform_client.create_compilation_result.assert_called_once()
+
+    resource.invalidate()
+
+    assert len(resource.assets) == 1
+    assert len(resource.asset_checks) == 1
+    assert default_dataform_client.create_compilation_result.call_count == 2
+    assert default_dataform_client.query_compilation_result_actions.call_count == 2
+
+    resource.refresh()
+
+    assert default_dataform_client.create_compilation_result.call_count == 3
+    assert len(resource.assets) == 1
+    assert len(resource.asset_checks) == 1
+    assert default_dataform_client.query_compilation_result_actions.call_count == 3
+
+
+@pytest.mark.client_config()
+def test_dataform_repository_resource_falls_back_to_listing_compilation_results(
+    mock_dataform_client,
+):
+    mock_dataform_client.create_compilation_result.return_value = (
+        dataform_v1.CompilationResult()
+    )
     resource = DataformRepositoryResource(
         project_id="test-project",
         repository_id="test-repo",
@@ -463,10 +396,158 @@ def test_dataform_repository_resource_load_dataform_asset_checks(mock_dataform_c
         client=mock_dataform_client,
     )
 
-    asset_checks = resource.asset_checks
+    assert len(resource.assets) == 1
+    mock_dataform_client.list_compilation_results.assert_called_once()
 
-    assert asset_checks is not None
-    assert len(asset_checks) == 1
-    assert isinstance(asset_checks[0], AssetChecksDefinition)
-    assert asset_checks[0].check_specs_by_output_name["spec"].name == "assertion_1"
-    assert asset_checks[0].keys_by_input_name["asset_key"].path[0] == "test_asset"
+
+def test_dataform_repository_resource_load_dataform_assets_reuses_compilation(
+    default_dataform_client, resource, monkeypatch
+):
+    assert resource.load_dataform_assets() is resource.assets
+
+    build_asset_checks = Mock()
+    monkeypatch.setattr(resource, "_build_asset_checks", build_asset_checks)
+    assets = resource.load_dataform_assets(fresh_policy_lag_minutes=60)
+
+    assert len(assets) == 1
+    assert assets[0].legacy_freshness_policy.maximum_lag_minutes == 60  # pyright: ignore[reportOptionalMemberAccess]
+    build_asset_checks.assert_not_called()
+    default_dataform_client.create_compilation_result.assert_called_once()
+    default_dataform_client.query_compilation_result_actions.assert_called_once()
+
+
+def test_dataform_repository_resource_dependency_maps(resource):
+    assert resource.forward_deps == {"test_asset": ["test_asset_1", "test_asset_2"]}
+    assert resource.reverse_deps == {
+        "test_asset_1": ["test_asset"],
+        "test_asset_2": ["test_asset"],
+    }
+
+
+class _AsyncPager:
+    def __init__(self, items):
+        self._items = items
+
+    async def __aiter__(self):
+        for item in self._items:
+            yield item
+
+
+def test_dataform_repository_resource_refresh_async(default_dataform_client, resource):
+    async_client = AsyncMock()
+    async_client.list_compilation_results.return_value = _AsyncPager(
+        default_dataform_client.list_compilation_results.return_value
+    )
+    async_client.list_workflow_invocations.return_value = _AsyncPager(
+        default_dataform_client.list_workflow_invocations.return_value
+    )
+
+    compilation_result_name, workflow_invocations = asyncio.run(
+        resource.refresh_async(minutes_ago=10, async_client=async_client)
+    )
+
+    async_client.list_compilation_results.assert_awaited_once()
+    async_client.list_workflow_invocations.assert_awaited_once()
+
+    assert compilation_result_name == "test-compilation-result"
+    assert len(workflow_invocations) == 1
+    assert workflow_invocations[0].name == "test-workflow-invocation"
+
+
+def test_dataform_repository_resource_refresh_async_shares_client_per_event_loop(
+    resource, monkeypatch
+):
+    async_client = AsyncMock()
+    async_client.list_compilation_results.return_value = _AsyncPager([])
+    async_client.list_workflow_invocations.return_value = _AsyncPager([])
+    async_client_factory = Mock(return_value=async_client)
+    monkeypatch.setattr(
+        resources.dataform_v1, "DataformAsyncClient", async_client_factory
+    )
+    monkeypatch.setattr(
+        resources, "_default_async_clients", weakref.WeakKeyDictionary()
+    )
+
+    async def refresh_twice():
+        await resource.refresh_async(minutes_ago=10)
+        await resource.refresh_async(minutes_ago=10)
+
+    asyncio.run(refresh_twice())
+    async_client_factory.assert_called_once_with()
+
+    # grpc.aio channels are bound to their loop, so a new loop gets its own client
+    asyncio.run(resource.refresh_async(minutes_ago=10))
+    assert async_client_factory.call_count == 2
+
+
+def test_dataform_repository_resource_large_sql_metadata_is_plain_text(resource):
+    small_query = "SELECT 1"
+    large_query = "SELECT 1 " + "-" * 10000
+    actions = [
+        dataform_v1.CompilationResultAction(
+            target=dataform_v1.Target(name=name, schema="test_schema"),
+            relation=dataform_v1.CompilationResultAction.Relation(
+                select_query=select_query
+            ),
+        )
+        for name, select_query in [("small", small_query), ("large", large_query)]
+    ]
+
+    assets, _, _ = resource._process_actions(actions)
+
+    assert assets[0].metadata["Asset SQL Code"] == MetadataValue.md(
+        f"```sql\n{small_query}\n```"
+    )
+    assert assets[1].metadata["Asset SQL Code"] == MetadataValue.text(large_query)
+
+
+def test_dataform_repository_resource_skips_invalid_actions(resource):
+    actions = [
+        # No target name
+        dataform_v1.CompilationResultAction(
+            relation=dataform_v1.CompilationResultAction.Relation(
+                select_query="SELECT 1"
+            ),
+        ),
+        # Assertion without a parent action
+        dataform_v1.CompilationResultAction(
+            target=dataform_v1.Target(name="orphan_assertion", schema="test_schema"),
+            assertion=dataform_v1.CompilationResultAction.Assertion(
+                select_query="SELECT 1"
+            ),
+        ),
+        # Dagster rejects the empty group name
+        dataform_v1.CompilationResultAction(
+            target=dataform_v1.Target(name="no_schema"),
+        ),
+        *MOCK_COMPILATION_RESULT_ACTIONS,
+    ]
+
+    assets, asset_checks, _ = resource._process_actions(actions)
+
+    assert [asset.key.path[0] for asset in assets] == ["test_asset"]
+    assert [
+        check.check_specs_by_output_name["spec"].name for check in asset_checks
+    ] == ["assertion_1"]
+
+
+def test_dataform_repository_resource_shares_default_client(monkeypatch):
+    mock_client_class = Mock()
+    monkeypatch.setattr(resources.dataform_v1, "DataformClient", mock_client_class)
+    monkeypatch.setattr(resources, "_default_client", None)
+
+    first = DataformRepositoryResource(
+        project_id="test-project",
+        repository_id="test-repo",
+        location="us-central1",
+        environment="dev",
+    )
+    second = DataformRepositoryResource(
+        project_id="test-project",
+        repository_id="test-repo",
+        location="us-central1",
+        environment="prod",
+    )
+
+    mock_client_class.assert_called_once_with(transport="grpc")
+    assert first.client is second.client